@@ -11,42 +11,87 @@ are not recomputed; the module only reshapes existing headers.
 """
 from __future__ import annotations
 
-from typing import List, Optional
+import re
+from typing import Optional, Tuple
 
+CRC_LINE_PREFIX = "HIICrc32="
 CRC_LINE_PATTERN = r"^HIICrc32=(?P<value>[^,\s]*)(?P<suffix>.*)$"
+_CRC_LINE_RE = re.compile(CRC_LINE_PATTERN)
+_CRC_MARKER_RE = re.compile(r"^\s*HIICrc32\s*=", re.MULTILINE)
 
 
-def _join_lines(lines: List[str], had_trailing_newline: bool) -> str:
-    result = "\n".join(lines)
-    return result + ("\n" if had_trailing_newline else "")
+def _line_end(text: str, start: int) -> int:
+    """Return the offset of the first line break at or after ``start``."""
 
+    lf_index = text.find("\n", start)
+    cr_index = text.find("\r", start, lf_index if lf_index >= 0 else len(text))
+    if cr_index >= 0:
+        return cr_index
+    return lf_index if lf_index >= 0 else len(text)
 
-def _find_crc_insertion_index(lines: List[str]) -> int:
-    insertion_index = 0
-    while insertion_index < len(lines):
-        stripped = lines[insertion_index].lstrip()
-        if stripped.startswith(("#", "//", ";")) or stripped == "":
-            insertion_index += 1
-            continue
-        break
-    return insertion_index
 
+def _next_line_start(text: str, line_end: int) -> int:
+    if text.startswith("\r\n", line_end):
+        return line_end + 2
+    return min(line_end + 1, len(text))
 
-def _extract_crc_suffix(crc_line: Optional[str]) -> str:
-    import re
 
+def _find_crc_line_bounds(text: str) -> Optional[Tuple[int, int]]:
+    """Locate the first ``HIICrc32=`` line as ``(start, end)`` offsets, excluding its line break."""
+
+    start = text.find(CRC_LINE_PREFIX)
+    while start >= 0:
+        if start == 0 or text[start - 1] in "\r\n":
+            return start, _line_end(text, start)
+        start = text.find(CRC_LINE_PREFIX, start + 1)
+    return None
+
+
+def _find_crc_insertion_offset(text: str) -> int:
+    offset = 0
+    while offset < len(text):
+        line_end = _line_end(text, offset)
+        stripped = text[offset:line_end].lstrip()
+        if stripped and not stripped.startswith(("#", "//", ";")):
+            break
+        offset = _next_line_start(text, line_end)
+    return offset
+
+
+def _insert_crc_line(text: str, crc_line: str) -> str:
+    if not text:
+        return crc_line
+    offset = _find_crc_insertion_offset(text)
+    if offset == len(text) and not text.endswith(("\n", "\r")):
+        return f"{text}\n{crc_line}"
+    return f"{text[:offset]}{crc_line}\n{text[offset:]}"
+
+
+def _remove_line(text: str, start: int, end: int) -> str:
+    next_start = _next_line_start(text, end)
+    if next_start == end and start > 0:
+        # Last line without a terminator: drop the preceding line break instead.
+        start -= 2 if text.startswith("\r\n", start - 2) else 1
+    return text[:start] + text[next_start:]
+
+
+def _extract_crc_suffix(crc_line: Optional[str]) -> str:
     if not crc_line:
         return ""
-    match = re.match(CRC_LINE_PATTERN, crc_line)
+    match = _CRC_LINE_RE.match(crc_line)
     if not match:
         return ""
     return match.group("suffix")
 
 
 def _contains_crc_marker(text: str) -> bool:
-    import re
-
-    return bool(re.search(r"^\s*HIICrc32\s*=", text, re.MULTILINE))
+    # Literal probe first: most exports either lack the marker entirely or carry
+    # it on the first line, so the multiline regex rarely has to walk the file.
+    if "HIICrc32" not in text:
+        return False
+    if text.startswith(CRC_LINE_PREFIX):
+        return True
+    return _CRC_MARKER_RE.search(text) is not None
 
 
 def recalculate_crc(
@@ -78,17 +123,12 @@ def recalculate_crc(
     if not initial_crc:
         return new_content
 
-    lines = new_content.splitlines()
-    had_trailing_newline = new_content.endswith(("\n", "\r"))
-
-    for idx, line in enumerate(lines):
-        if line.startswith("HIICrc32="):
-            lines[idx] = initial_crc
-            return _join_lines(lines, had_trailing_newline)
+    bounds = _find_crc_line_bounds(new_content)
+    if bounds is not None:
+        start, end = bounds
+        return new_content[:start] + initial_crc + new_content[end:]
 
-    insertion_index = _find_crc_insertion_index(lines)
-    lines.insert(insertion_index, initial_crc)
-    return _join_lines(lines, had_trailing_newline or not lines)
+    return _insert_crc_line(new_content, initial_crc)
 
 
 def _apply_crc_bypass(content: str, initial_crc: Optional[str], mode: str, tool_version: str) -> str:
@@ -96,40 +136,33 @@ def _apply_crc_bypass(content: str, initial_crc: Optional[str], mode: str, tool_
     if normalized_mode not in {"empty", "remove", "placeholder"}:
         raise ValueError(f"Unsupported CRC bypass mode '{mode}'.")
 
-    lines = content.splitlines()
-    had_trailing_newline = content.endswith(("\n", "\r"))
     placeholder_value = f"<bypassed by nvram-tweaker {tool_version}>"
+    bounds = _find_crc_line_bounds(content)
 
-    for idx, line in enumerate(lines):
-        if not line.startswith("HIICrc32="):
-            continue
-
+    if bounds is not None:
+        start, end = bounds
         if normalized_mode == "remove":
-            del lines[idx]
-            return _join_lines(lines, had_trailing_newline)
+            return _remove_line(content, start, end)
 
         if normalized_mode == "placeholder":
-            suffix = _extract_crc_suffix(line) or _extract_crc_suffix(initial_crc)
-            lines[idx] = f"HIICrc32={placeholder_value}{suffix}"
-            return _join_lines(lines, had_trailing_newline)
+            suffix = _extract_crc_suffix(content[start:end]) or _extract_crc_suffix(initial_crc)
+            return f"{content[:start]}HIICrc32={placeholder_value}{suffix}{content[end:]}"
 
-        lines[idx] = "HIICrc32="
-        return _join_lines(lines, had_trailing_newline)
+        return f"{content[:start]}HIICrc32={content[end:]}"
 
     if normalized_mode == "placeholder":
         suffix = _extract_crc_suffix(initial_crc)
-        insertion_index = _find_crc_insertion_index(lines)
-        lines.insert(insertion_index, f"HIICrc32={placeholder_value}{suffix}")
-        return _join_lines(lines, had_trailing_newline or not lines)
+        return _insert_crc_line(content, f"HIICrc32={placeholder_value}{suffix}")
 
     return content
 
 
 __all__ = [
     "CRC_LINE_PATTERN",
+    "CRC_LINE_PREFIX",
     "_contains_crc_marker",
     "_extract_crc_suffix",
-    "_find_crc_insertion_index",
-    "_join_lines",
+    "_find_crc_insertion_offset",
+    "_find_crc_line_bounds",
     "recalculate_crc",
 ]
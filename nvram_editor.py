@@ -7,20 +7,21 @@ token, and applied to one or many matching blocks.
 from __future__ import annotations
 
 import argparse
+import hashlib
 import logging
 import mmap
+import os
 import re
+import shutil
+import zlib
 from collections import deque
+from contextlib import contextmanager
 from dataclasses import replace
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
-from nvram_crc import _contains_crc_marker, recalculate_crc
+from nvram_crc import CRC_LINE_PREFIX, _contains_crc_marker, recalculate_crc
 from nvram_parsing import (
-    BLOCK_PATTERN,
-    HELP_PATTERN,
-    MAX_PATTERN,
-    MIN_PATTERN,
     NUMERIC_INPUT_PATTERN,
     OPTION_LINE_PATTERN,
     SETUP_BOUNDARY_PATTERN,
@@ -39,31 +40,122 @@ LOGGER = logging.getLogger(__name__)
 
 MMAP_READ_THRESHOLD = 4 * 1024 * 1024
 TOOL_VERSION = "0.0.0-dev"
+UNDO_COMPRESSION_LEVEL = 1
+WHITESPACE_PATTERN = re.compile(r"\s+")
 
-def _read_file_via_mmap(path: Path) -> bytes:
+@contextmanager
+def _mmap_file(path: Path) -> Iterator[mmap.mmap]:
     """
-    Read file contents using a memory map to limit peak memory usage for large files.
+    Map a file read-only so large exports can be decoded without an intermediate bytes copy.
     """
     with path.open("rb") as handle:
         with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm_obj:
-            return mm_obj.read()
+            _advise_sequential_read(mm_obj)
+            yield mm_obj
+
+
+def _advise_sequential_read(mm_obj: mmap.mmap) -> None:
+    # Decoding and parsing walk the mapping front to back; let the kernel prefetch
+    # aggressively and drop consumed pages. madvise is unavailable on Windows.
+    if not hasattr(mm_obj, "madvise"):
+        return
+    for advice_name in ("MADV_SEQUENTIAL", "MADV_WILLNEED"):
+        advice = getattr(mmap, advice_name, None)
+        if advice is None:
+            continue
+        try:
+            mm_obj.madvise(advice)
+        except OSError:
+            LOGGER.debug("madvise(%s) rejected; continuing without the hint.", advice_name)
+
+
+def _normalize_label(text: str) -> str:
+    return WHITESPACE_PATTERN.sub("", text).lower()
+
+
+def _content_digest(data: Union[bytes, mmap.mmap]) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _file_digest(path: Path) -> bytes:
+    if path.stat().st_size >= MMAP_READ_THRESHOLD:
+        with _mmap_file(path) as mapped:
+            return _content_digest(mapped)
+    return _content_digest(path.read_bytes())
+
 
+def _write_durably(path: Path, content: bytes) -> None:
+    """Write ``content`` with raw ``os.write`` calls and fsync before returning.
 
-def _decode_bytes(raw_bytes: bytes, path: Path) -> tuple[str, str]:
+    Syncing the temporary file before it is renamed over the original keeps a
+    crash from leaving a renamed but still empty file behind.
+    """
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
     try:
-        return raw_bytes.decode("utf-8"), "utf-8"
+        view = memoryview(content)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_with_backup(path: Path, content: bytes) -> None:
+    """Write ``content`` to ``path``, keeping the previous file as ``<name>.bak``.
+
+    The new content goes to a temporary sibling first; the old file is then
+    renamed to the backup and the temporary file renamed into place, so the
+    backup costs a metadata update instead of a full read and write.
+    """
+
+    temp_path = path.with_name(path.name + ".tmp")
+    backup_path = path.with_name(path.name + ".bak")
+    try:
+        _write_durably(temp_path, content)
+        shutil.copymode(path, temp_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+    try:
+        os.replace(path, backup_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        os.replace(backup_path, path)
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _detect_line_ending(raw_bytes: Union[bytes, mmap.mmap]) -> str:
+    # Checked on the encoded buffer: CR/LF bytes are identical in UTF-8 and latin-1.
+    return "\r\n" if raw_bytes.find(b"\r\n") >= 0 else "\n"
+
+
+def _line_number_at(raw_bytes: Union[bytes, mmap.mmap], offset: int) -> int:
+    if isinstance(raw_bytes, bytes):
+        return raw_bytes.count(b"\n", 0, offset) + 1
+    return raw_bytes[:offset].count(b"\n") + 1
+
+
+def _decode_bytes(raw_bytes: Union[bytes, mmap.mmap], path: Path) -> tuple[str, str]:
+    # ``str(buffer, encoding)`` accepts any buffer, so mapped files decode without a bytes copy.
+    try:
+        return str(raw_bytes, "utf-8"), "utf-8"
     except UnicodeDecodeError as exc:
         try:
-            text = raw_bytes.decode("latin-1")
+            text = str(raw_bytes, "latin-1")
         except UnicodeDecodeError:
-            preview = raw_bytes[: exc.start].decode("utf-8", errors="ignore")
-            line_number = preview.count("\n") + 1
+            line_number = _line_number_at(raw_bytes, exc.start)
             raise ValueError(
                 f"Failed to decode '{path}' as UTF-8 or latin-1 near line {line_number}: {exc.reason}."
             ) from exc
 
-        preview = raw_bytes[: exc.start].decode("utf-8", errors="ignore")
-        line_number = preview.count("\n") + 1
+        line_number = _line_number_at(raw_bytes, exc.start)
         LOGGER.warning(
             "Decoded '%s' with latin-1 after UTF-8 failure near line %d.",
             path,
@@ -84,7 +176,10 @@ class NVRAMManager:
         self._backup_via_copy: bool = False
         self._encoding: str = "utf-8"
         self.last_saved_text: Optional[str] = None
-        self.undo_stack: deque[str] = deque(maxlen=5)
+        self._last_saved_digest: Optional[bytes] = None
+        self._pending_reparse: Optional[Tuple[str, List[QuestionBlock], str]] = None
+        # Snapshots are zlib-compressed encoded text; undo is rare and NVRAM exports compress well.
+        self.undo_stack: deque[bytes] = deque(maxlen=5)
 
     def load_file(self, path: Path) -> "NVRAMManager":
         if not path.exists():
@@ -94,16 +189,20 @@ class NVRAMManager:
         use_mmap = file_size >= MMAP_READ_THRESHOLD
         try:
             if use_mmap:
-                raw_bytes = _read_file_via_mmap(path)
+                with _mmap_file(path) as mapped:
+                    text, self._encoding = _decode_bytes(mapped, path)
+                    loaded_digest = _content_digest(mapped)
+                    line_ending = _detect_line_ending(mapped)
                 self._backup_via_copy = True
             else:
                 raw_bytes = path.read_bytes()
+                text, self._encoding = _decode_bytes(raw_bytes, path)
+                loaded_digest = _content_digest(raw_bytes)
+                line_ending = _detect_line_ending(raw_bytes)
                 self._backup_via_copy = False
         except OSError as exc:
             raise ValueError(f"Unable to read '{path}': {exc}") from exc
 
-        text, self._encoding = _decode_bytes(raw_bytes, path)
-
         try:
             self.blocks, self.trailing_text = find_blocks(text)
         except re.error as exc:
@@ -112,25 +211,38 @@ class NVRAMManager:
         self.path = path
         self.original_text = None if self._backup_via_copy else text
         self.last_saved_text = text
+        self._last_saved_digest = loaded_digest
         self.undo_stack.clear()
         self.initial_crc = self._extract_crc_header(text)
-        self.has_crc_marker = _contains_crc_marker(text)
-        self.line_ending = "\r\n" if "\r\n" in text else "\n"
+        self.has_crc_marker = self._has_crc_marker(text)
+        self.line_ending = line_ending
         return self
 
     @staticmethod
     def _extract_crc_header(text: str) -> Optional[str]:
-        lines = text.splitlines()
-        first_line = lines[0].strip() if lines else ""
+        newline_index = text.find("\n")
+        first_line = text[:newline_index] if newline_index >= 0 else text
+        first_line = first_line.partition("\r")[0].strip()
         if first_line.startswith("HIICrc32"):
             return first_line
         return None
 
+    def _has_crc_marker(self, text: str) -> bool:
+        # The header probe also accepts lines like "HIICrc32 x"; only a real
+        # "HIICrc32=" header lets us skip scanning the text for a marker.
+        if self.initial_crc is not None and self.initial_crc.startswith(CRC_LINE_PREFIX):
+            return True
+        return _contains_crc_marker(text)
+
     def _normalize_newlines(self, content: str) -> str:
+        if "\r" not in content:
+            return content if self.line_ending == "\n" else content.replace("\n", self.line_ending)
+        if self.line_ending == "\r\n" and content.count("\r\n") == content.count("\r") == content.count("\n"):
+            return content
         content = content.replace("\r\n", "\n").replace("\r", "\n")
         if self.line_ending == "\n":
             return content
-        return self.line_ending.join(content.split("\n"))
+        return content.replace("\n", self.line_ending)
 
     def update_value(self, block: QuestionBlock, new_value: int) -> QuestionBlock:
         def replace_match(match: re.Match[str]) -> str:
@@ -149,20 +261,12 @@ class NVRAMManager:
         return block.with_body(new_body).with_fields(new_fields)
 
     def update_options(self, block: QuestionBlock, option_label: str) -> QuestionBlock:
-        def _normalize(text: str) -> str:
-            return re.sub(r"\s+", "", text).lower()
-
-        normalized_target = _normalize(option_label)
-        lines = block.body.splitlines(keepends=True)
-
-        option_labels: List[str] = []
-        for line in lines:
-            opt_match = OPTION_LINE_PATTERN.match(line)
-            if not opt_match:
-                continue
-            code = opt_match.group("code")
-            label = opt_match.group("label").rstrip("\r\n")
-            option_labels.append(_normalize(f"[{code}]{label}"))
+        normalized_target = _normalize_label(option_label)
+        body = block.body
+        option_matches = list(OPTION_LINE_PATTERN.finditer(body))
+        option_labels = [
+            _normalize_label(f"[{opt_match.group('code')}]{opt_match.group('label')}") for opt_match in option_matches
+        ]
 
         exact_matches = [idx for idx, label in enumerate(option_labels) if label == normalized_target]
         substring_matches = [idx for idx, label in enumerate(option_labels) if normalized_target in label]
@@ -181,29 +285,25 @@ class NVRAMManager:
 
         target_option_index = target_indices[0]
 
-        new_lines: List[str] = []
-        new_fields: List[OptionField | ValueField] = []
-        option_counter = 0
-
-        for line in lines:
-            opt_match = OPTION_LINE_PATTERN.match(line)
-            if not opt_match:
-                new_lines.append(line)
+        # Only lines whose star state flips are touched; everything else is copied by slice.
+        body_parts: List[str] = []
+        cursor = 0
+        for option_index, opt_match in enumerate(option_matches):
+            make_selected = option_index == target_option_index
+            if bool(opt_match.group("star")) == make_selected:
                 continue
-
-            prefix = opt_match.group("prefix")
-            code = opt_match.group("code")
-            label = opt_match.group("label").rstrip("\r\n")
-            line_ending = "\r\n" if line.endswith("\r\n") else ("\n" if line.endswith("\n") else "")
-
-            is_target = option_counter == target_option_index
-            if is_target:
-                new_lines.append(f"{prefix}*[{code}]{label}{line_ending}")
+            if make_selected:
+                bracket_offset = opt_match.start("code") - 1
+                body_parts.append(body[cursor:bracket_offset])
+                body_parts.append("*")
+                cursor = bracket_offset
             else:
-                new_lines.append(f"{prefix}[{code}]{label}{line_ending}")
-
-            option_counter += 1
+                star_offset = opt_match.start("star")
+                body_parts.append(body[cursor:star_offset])
+                cursor = star_offset + 1
+        body_parts.append(body[cursor:])
 
+        new_fields: List[OptionField | ValueField] = []
         option_counter = 0
         for field in block.fields:
             if isinstance(field, OptionField):
@@ -212,13 +312,14 @@ class NVRAMManager:
             else:
                 new_fields.append(field)
 
-        return block.with_body("".join(new_lines)).with_fields(new_fields)
+        return block.with_body("".join(body_parts)).with_fields(new_fields)
 
     def filter_blocks(self, query: str, exact: bool, token: Optional[str]) -> List[QuestionBlock]:
-        filtered = [b for b in self.blocks if matches_name(b, query, exact)]
-        if token is not None:
-            filtered = [b for b in filtered if b.token == token]
-        return filtered
+        # Single pass; the cheap token comparison runs before the name match.
+        if exact:
+            return [b for b in self.blocks if (token is None or b.token == token) and b.name == query]
+        lowered_query = query.lower()
+        return [b for b in self.blocks if (token is None or b.token == token) and lowered_query in b.name.lower()]
 
     def save(
         self,
@@ -242,23 +343,19 @@ class NVRAMManager:
         if self.path is None:
             raise ValueError("No file is currently loaded; cannot save changes.")
 
-        self._verify_reparse_consistency(new_content)
+        reparsed_blocks, reparsed_trailing = self._verify_reparse_consistency(new_content)
 
         try:
-            current_disk_text = self._read_text_from_disk(path)
-        except ValueError as exc:
+            current_disk_digest = _file_digest(path)
+        except OSError as exc:
             raise ValueError(f"Unable to read the current file for backup: {exc}") from exc
 
-        if self.last_saved_text is not None and current_disk_text != self.last_saved_text:
+        if self._last_saved_digest is not None and current_disk_digest != self._last_saved_digest:
             raise ValueError(
                 "The on-disk file has changed since it was loaded. Reload and re-apply your changes to avoid "
                 "overwriting external edits."
             )
 
-        backup_path = path.with_name(path.name + ".bak")
-        backup_path.write_text(current_disk_text, encoding=self._encoding)
-        self.undo_stack.append(current_disk_text)
-
         updated_content = recalculate_crc(
             new_content,
             self.initial_crc,
@@ -267,9 +364,17 @@ class NVRAMManager:
             tool_version=TOOL_VERSION,
         )
         updated_content = self._normalize_newlines(updated_content)
-        path.write_text(updated_content, encoding=self._encoding, newline="")
+        encoded_content = updated_content.encode(self._encoding)
+        _replace_with_backup(path, encoded_content)
+        # Only a completed write hands the verified parse to _refresh_state_from_text,
+        # so a rejected or failed save never keeps the pending text and blocks alive.
+        self._pending_reparse = (new_content, reparsed_blocks, reparsed_trailing)
+        if self.last_saved_text is not None:
+            self.undo_stack.append(zlib.compress(self.last_saved_text.encode(self._encoding), UNDO_COMPRESSION_LEVEL))
         self.last_saved_text = updated_content
-        self._refresh_state_from_text(updated_content)
+        self._last_saved_digest = _content_digest(encoded_content)
+        # The written text was normalized to self.line_ending, so the detected ending stands.
+        self._refresh_state_from_text(updated_content, self.line_ending)
 
     def rollback_last_save(self) -> None:
         if self.path is None:
@@ -278,10 +383,12 @@ class NVRAMManager:
         if not self.undo_stack:
             raise ValueError("No prior save is available to roll back to.")
 
-        previous_content = self.undo_stack.pop()
-        self.path.write_text(previous_content, encoding=self._encoding, newline="")
+        encoded_content = zlib.decompress(self.undo_stack.pop())
+        previous_content = encoded_content.decode(self._encoding)
+        self.path.write_bytes(encoded_content)
         self.last_saved_text = previous_content
-        self._refresh_state_from_text(previous_content)
+        self._last_saved_digest = _content_digest(encoded_content)
+        self._refresh_state_from_text(previous_content, _detect_line_ending(encoded_content))
 
     def rebuild_text(self, blocks: Optional[List[QuestionBlock]] = None) -> str:
         """Round-trip blocks back to text while preserving formatting.
@@ -294,35 +401,28 @@ class NVRAMManager:
         render_blocks = blocks if blocks is not None else self.blocks
         return rebuild_text(render_blocks, trailing_text=self.trailing_text)
 
-    def _verify_reparse_consistency(self, new_content: str) -> None:
+    def _verify_reparse_consistency(self, new_content: str) -> Tuple[List[QuestionBlock], str]:
         reparsed_blocks, reparsed_trailing = find_blocks(new_content)
         round_tripped = rebuild_text(reparsed_blocks, trailing_text=reparsed_trailing)
         if round_tripped != new_content:
             raise ValueError(
                 "Detected divergence after re-parsing the pending changes; save aborted to prevent data loss."
             )
+        return reparsed_blocks, reparsed_trailing
 
-    def _read_text_from_disk(self, path: Path) -> str:
-        try:
-            with path.open("r", encoding=self._encoding, newline="") as handle:
-                return handle.read()
-        except UnicodeDecodeError:
+    def _refresh_state_from_text(self, text: str, line_ending: str) -> None:
+        pending_reparse, self._pending_reparse = self._pending_reparse, None
+        if pending_reparse is not None and pending_reparse[0] == text:
+            # Saves usually write exactly what was verified; reuse that parse instead of running it again.
+            _, self.blocks, self.trailing_text = pending_reparse
+        else:
             try:
-                with path.open("r", encoding="latin-1", newline="") as handle:
-                    return handle.read()
-            except (UnicodeDecodeError, OSError) as exc:
-                raise ValueError(str(exc)) from exc
-        except OSError as exc:
-            raise ValueError(str(exc)) from exc
-
-    def _refresh_state_from_text(self, text: str) -> None:
-        try:
-            self.blocks, self.trailing_text = find_blocks(text)
-        except re.error as exc:
-            raise ValueError(f"Unable to re-parse content after save/rollback: {exc}") from exc
+                self.blocks, self.trailing_text = find_blocks(text)
+            except re.error as exc:
+                raise ValueError(f"Unable to re-parse content after save/rollback: {exc}") from exc
         self.initial_crc = self._extract_crc_header(text)
-        self.has_crc_marker = _contains_crc_marker(text)
-        self.line_ending = "\r\n" if "\r\n" in text else "\n"
+        self.has_crc_marker = self._has_crc_marker(text)
+        self.line_ending = line_ending
 
 
 def matches_name(block: QuestionBlock, query: str, exact: bool) -> bool:
@@ -332,9 +432,8 @@ def matches_name(block: QuestionBlock, query: str, exact: bool) -> bool:
 
 
 def selected_option(body: str) -> Optional[str]:
-    for line in body.splitlines():
-        opt_match = OPTION_LINE_PATTERN.match(line)
-        if opt_match and opt_match.group("star"):
+    for opt_match in OPTION_LINE_PATTERN.finditer(body):
+        if opt_match.group("star"):
             code = opt_match.group("code")
             label = opt_match.group("label").rstrip()
             return f"*[{code}]{label}"
@@ -360,7 +459,7 @@ def format_help_text(help_string: Optional[str]) -> str:
     if not help_string:
         return ""
 
-    help_text = " ".join(help_string.split())
+    help_text = WHITESPACE_PATTERN.sub(" ", help_string).strip()
     max_help_length = 120
     if len(help_text) > max_help_length:
         return help_text[: max_help_length - 3] + "..."
@@ -380,7 +479,16 @@ def apply_changes(
     indices: Iterable[int],
     option_label: Optional[str],
     new_value: Optional[int],
+    *,
+    on_error: Optional[Callable[[int, ValueError], None]] = None,
 ) -> List[QuestionBlock]:
+    """Return a copy of ``blocks`` with the change applied to every index.
+
+    By default the first failing block raises ``ValueError``. When ``on_error``
+    is given, it receives ``(index, error)`` for each failing block and the
+    remaining indices are still updated.
+    """
+
     updated_blocks = blocks.copy()
     for idx in indices:
         block = blocks[idx]
@@ -393,9 +501,11 @@ def apply_changes(
             else:
                 raise ValueError("Either option_label or new_value must be provided")
         except ValueError as exc:
-            raise ValueError(
-                f"{exc} (block '{block.name}' starting near line {block.line_number})"
-            ) from exc
+            error = ValueError(f"{exc} (block '{block.name}' starting near line {block.line_number})")
+            if on_error is None:
+                raise error from exc
+            on_error(idx, error)
+            continue
         updated_blocks[idx] = updated_block
     return updated_blocks
 
@@ -453,7 +563,8 @@ def main() -> int:
         if not candidates:
             raise ValueError("No matching Setup Question blocks found")
 
-        target_indices = [blocks.index(b) for b in candidates]
+        index_by_block_id = {id(block): idx for idx, block in enumerate(blocks)}
+        target_indices = [index_by_block_id[id(b)] for b in candidates]
         if len(target_indices) > 1 and not args.all and args.token is None:
             LOGGER.info("Multiple matching blocks found:")
             for display_index, block_index in enumerate(target_indices, start=1):
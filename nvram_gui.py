@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import re
 import sys
+from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
 
 import dearpygui.dearpygui as dpg
 from tkinter import Tk, filedialog
@@ -24,12 +25,15 @@ def resource_path(relative_path: str) -> str:
     return str(Path(base_path) / relative_path)
 
 
-INLINE_COMMENT_PATTERN = re.compile(r"\s//")
+_SEARCH_SEPARATOR_TABLE = str.maketrans("-_", "  ")
+LOG_HISTORY_LIMIT = 400
+SEARCH_DEBOUNCE_FRAMES = 3
 BYPASS_MODE_LABELS = {
     "Empty CRC value (unsafe)": "empty",
     "Remove CRC line (unsafe)": "remove",
     "Version placeholder": "placeholder",
 }
+DEFAULT_BYPASS_MODE_LABEL = "Version placeholder"
 DEFAULT_VIEWPORT_WIDTH = 1200
 DEFAULT_VIEWPORT_HEIGHT = 840
 SIDEBAR_WIDTH_MIN = 320
@@ -52,13 +56,22 @@ SIDEBAR_LIST_MIN = 240
 SIDEBAR_LIST_RATIO = 0.55
 
 
-@dataclass
+@dataclass(frozen=True)
 class OptionEntry:
     display: str
     match_value: str
     selected: bool
 
 
+@dataclass
+class CRCUIState:
+    """CRC controls as last reported by their callbacks, so saves need no widget reads."""
+
+    bypass: bool = False
+    mode: str = BYPASS_MODE_LABELS[DEFAULT_BYPASS_MODE_LABEL]
+    force: bool = False
+
+
 @dataclass
 class PendingChange:
     block_indices: List[int]
@@ -74,81 +87,173 @@ class PendingChange:
 class GUIState:
     manager: NVRAMManager = field(default_factory=NVRAMManager)
     blocks: List[QuestionBlock] = field(default_factory=list)
-    original_blocks: List[QuestionBlock] = field(default_factory=list)
+    # Pre-edit block for each index changed since the last load or save.
+    original_blocks: Dict[int, QuestionBlock] = field(default_factory=dict)
+    normalized_names: List[str] = field(default_factory=list)
+    word_masks: Dict[str, int] = field(default_factory=dict)
     label_to_index: Dict[str, int] = field(default_factory=dict)
     selected_index: Optional[int] = None
     selected_indices: List[int] = field(default_factory=list)
-    log_messages: List[str] = field(default_factory=list)
+    log_messages: Deque[str] = field(default_factory=lambda: deque(maxlen=LOG_HISTORY_LIMIT))
     header_font: Optional[int] = None
     body_font: Optional[int] = None
     mono_font: Optional[int] = None
     pending_change: Optional["PendingChange"] = None
     modified_indices: Set[int] = field(default_factory=set)
+    visible_indices: Set[int] = field(default_factory=set)
+    row_labels: Dict[int, str] = field(default_factory=dict)
+    base_labels: List[str] = field(default_factory=list)
+    checked_rows: Set[int] = field(default_factory=set)
     batch_list_theme: Optional[int] = None
     select_all_flash_theme: Optional[int] = None
     modified_sidebar_theme: Optional[int] = None
+    layout_tags: Optional[FrozenSet[str]] = None
+    applied_layout: Optional[Dict[str, int]] = None
+    resize_pending: bool = False
+    log_flush_pending: bool = False
+    search_generation: int = 0
+    frame_tasks: Dict[int, List[Callable[[], None]]] = field(default_factory=dict)
+    crc_ui: CRCUIState = field(default_factory=CRCUIState)
 
     def reset(self) -> None:
         self.blocks = []
-        self.original_blocks = []
+        self.original_blocks = {}
+        self.normalized_names = []
+        self.word_masks = {}
         self.label_to_index = {}
         self.selected_index = None
         self.selected_indices = []
-        self.log_messages = []
+        self.log_messages.clear()
         self.pending_change = None
         self.modified_indices = set()
+        self.visible_indices = set()
+        self.row_labels = {}
+        self.base_labels = []
+        self.checked_rows = set()
 
 
 state = GUIState()
 
 
-def append_log(message: str) -> None:
-    state.log_messages.append(message)
-    state.log_messages = state.log_messages[-400:]
+def schedule_frame_task(frames_ahead: int, task: Callable[[], None]) -> None:
+    """Run ``task`` once the render loop reaches ``frames_ahead`` frames from now.
+
+    The app runs with manual callback management, so item callbacks and these
+    tasks are both drained from the render loop on the main thread and never
+    interleave. Draining everything that is due (or overdue) means a task always
+    runs, so the pending flags that guard log flushes and resizes cannot get stuck.
+    """
+
+    target_frame = dpg.get_frame_count() + frames_ahead
+    state.frame_tasks.setdefault(target_frame, []).append(task)
+
+
+def run_due_frame_tasks() -> None:
+    """Run every scheduled task whose target frame has been reached."""
+
+    current_frame = dpg.get_frame_count()
+    due_frames = sorted(frame for frame in state.frame_tasks if frame <= current_frame)
+    due_tasks = [task for frame in due_frames for task in state.frame_tasks.pop(frame)]
+    for task in due_tasks:
+        task()
+
+
+def _flush_log() -> None:
+    state.log_flush_pending = False
     if dpg.does_item_exist("log_output"):
         dpg.set_value("log_output", "\n".join(state.log_messages))
 
 
+def append_log(message: str) -> None:
+    state.log_messages.append(message)
+    # Bursts (e.g. per-block skips during a batch apply) are rendered once on the next frame.
+    if not state.log_flush_pending:
+        state.log_flush_pending = True
+        schedule_frame_task(1, _flush_log)
+
+
 def bind_mono_font(tag: str) -> None:
     if state.mono_font and dpg.does_item_exist(tag):
         dpg.bind_item_font(tag, state.mono_font)
 
 
-def extract_options(body: str) -> List[OptionEntry]:
-    options: List[OptionEntry] = []
-    for line in body.splitlines():
-        opt_match = OPTION_LINE_PATTERN.match(line)
-        if not opt_match:
-            continue
+def _strip_inline_comment(label: str) -> str:
+    """Drop a trailing ``// comment`` that is preceded by whitespace."""
+
+    marker = label.find("//", 1)
+    while marker > 0:
+        if label[marker - 1].isspace():
+            return label[: marker - 1]
+        marker = label.find("//", marker + 1)
+    return label
+
 
+@lru_cache(maxsize=512)
+def extract_options(body: str) -> Tuple[OptionEntry, ...]:
+    """Parse the option entries of a block body.
+
+    Results are memoized by body text so reselecting a block or describing it in
+    the save summary does not rescan its lines.
+    """
+
+    options: List[OptionEntry] = []
+    for opt_match in OPTION_LINE_PATTERN.finditer(body):
         code = opt_match.group("code")
         label = opt_match.group("label")
-        cleaned_label = INLINE_COMMENT_PATTERN.split(label, maxsplit=1)[0].strip() or label.strip()
+        cleaned_label = _strip_inline_comment(label).strip() or label.strip()
         cleaned_display = f"{cleaned_label} [{code}]"
         match_value = f"[{code}]{cleaned_label}"
         options.append(
             OptionEntry(display=cleaned_display, match_value=match_value, selected=bool(opt_match.group("star")))
         )
-    return options
+    return tuple(options)
 
 
+@lru_cache(maxsize=512)
 def _selected_option_display(body: str) -> Optional[str]:
-    for line in body.splitlines():
-        opt_match = OPTION_LINE_PATTERN.match(line)
-        if opt_match and opt_match.group("star"):
+    for opt_match in OPTION_LINE_PATTERN.finditer(body):
+        if opt_match.group("star"):
             code = opt_match.group("code")
-            label = INLINE_COMMENT_PATTERN.split(opt_match.group("label"), maxsplit=1)[0].strip()
+            label = _strip_inline_comment(opt_match.group("label")).strip()
             return f"*[{code}]{label}"
     return None
 
 
+@lru_cache(maxsize=512)
+def classify_body(body: str) -> Tuple[str, object]:
+    """Classify a block body as ``("value", text)``, ``("options", entries)`` or ``("none", None)``.
+
+    A Value line takes precedence over option lines, matching how the editor
+    panel renders blocks. Bodies without the ``Value`` literal skip the value
+    regex entirely.
+    """
+
+    if "Value" in body:
+        value_match = VALUE_PATTERN.search(body)
+        if value_match:
+            return "value", value_match.group("value")
+    options = extract_options(body)
+    if options:
+        return "options", options
+    return "none", None
+
+
 def _describe_block_setting(block: Optional[QuestionBlock]) -> str:
     if block is None:
         return "<unknown>"
-    value_match = VALUE_PATTERN.search(block.body)
-    if value_match:
-        return f"Value <{value_match.group('value')}>"
-    option = _selected_option_display(block.body)
+    return _describe_body_setting(block.body)
+
+
+# Keyed on the body text, which fully determines the description. Sized for large
+# batch summaries so reopening the save dialog reuses every before/after line.
+@lru_cache(maxsize=4096)
+def _describe_body_setting(body: str) -> str:
+    kind, payload = classify_body(body)
+    if kind == "value":
+        return f"Value <{payload}>"
+    if kind == "none":
+        return "No selection"
+    option = _selected_option_display(body)
     if option:
         return f"Selected {option}"
     return "No selection"
@@ -233,12 +338,11 @@ def flash_select_all_button() -> None:
 
     dpg.bind_item_theme("select_all_filtered_button", theme)
 
-    def _reset_theme(sender: Optional[int] = None, app_data: Optional[object] = None) -> None:
+    def _reset_theme() -> None:
         if dpg.does_item_exist("select_all_filtered_button"):
             dpg.bind_item_theme("select_all_filtered_button", None)
 
-    current_frame = dpg.get_frame_count()
-    dpg.set_frame_callback(current_frame + 45, _reset_theme)
+    schedule_frame_task(45, _reset_theme)
 
 
 def update_batch_indicator() -> None:
@@ -262,31 +366,52 @@ def update_batch_indicator() -> None:
         dpg.bind_item_theme("question_list_container", None)
 
 
-def get_filtered_indices(filter_text: str) -> List[int]:
-    def _normalize(text: str) -> str:
-        collapsed = text.replace("-", " ").replace("_", " ").lower()
-        return " ".join(collapsed.split())
+def _normalize_search_text(text: str) -> str:
+    # str.lower() stays separate from the table so non-ASCII names still fold correctly.
+    collapsed = text.translate(_SEARCH_SEPARATOR_TABLE).lower()
+    return " ".join(collapsed.split())
 
-    normalized_filter = _normalize(filter_text)
-    if not normalized_filter:
-        return list(range(len(state.blocks)))
 
-    words = normalized_filter.split()
-    normalized_names = [_normalize(block.name) for block in state.blocks]
-    matching_indices: Set[int] = set(range(len(state.blocks)))
+def _word_mask(word: str) -> int:
+    """Return a bitmap with bit ``i`` set when normalized name ``i`` contains ``word``."""
+
+    mask = state.word_masks.get(word)
+    if mask is None:
+        # Build the bit string in one pass; OR-ing 1 << idx per hit would be quadratic.
+        bits = "".join("1" if word in name else "0" for name in reversed(state.normalized_names))
+        mask = int(bits or "0", 2)
+        state.word_masks[word] = mask
+    return mask
+
 
-    for word in words:
-        word_matches = {idx for idx, name in enumerate(normalized_names) if word in name}
-        if not word_matches:
-            append_log(f"No results found because the word '{word}' is missing from all question names.")
-            return []
-        matching_indices &= word_matches
+@lru_cache(maxsize=256)
+def _query_words(filter_text: str) -> Tuple[str, ...]:
+    # Kept apart from the name normalization at load time so block names do not evict queries.
+    return tuple(_normalize_search_text(filter_text).split())
 
-    if not matching_indices:
-        append_log("No results found containing all search words in a single question name.")
+
+def get_filtered_indices(filter_text: str) -> List[int]:
+    words = _query_words(filter_text)
+    if not words:
+        return list(range(len(state.blocks)))
+
+    # Per-word masks are cached for the loaded file, so typing another word
+    # only scans the names once for the new word and ANDs the rest.
+    word_masks = [_word_mask(word) for word in words]
+    result = (1 << len(state.normalized_names)) - 1
+    for mask in word_masks:
+        result &= mask
+
+    if not result:
+        missing_word = next((word for word, mask in zip(words, word_masks) if not mask), None)
+        if missing_word is not None:
+            append_log(f"No results found because the word '{missing_word}' is missing from all question names.")
+        else:
+            append_log("No results found containing all search words in a single question name.")
         return []
 
-    return sorted(matching_indices)
+    # bin() lists bits most-significant first; reverse it so positions map to indices.
+    return [idx for idx, bit in enumerate(bin(result)[:1:-1]) if bit == "1"]
 
 
 def rebuild_controls(block_index: int, block: QuestionBlock) -> None:
@@ -295,9 +420,9 @@ def rebuild_controls(block_index: int, block: QuestionBlock) -> None:
 
     dpg.delete_item("control_region", children_only=True)
 
-    value_match = VALUE_PATTERN.search(block.body)
-    if value_match:
-        current_value_text = value_match.group("value")
+    kind, payload = classify_body(block.body)
+    if kind == "value":
+        current_value_text = str(payload)
         use_numeric_input = current_value_text.isdigit()
 
         with dpg.group(parent="control_region", horizontal=True):
@@ -332,11 +457,12 @@ def rebuild_controls(block_index: int, block: QuestionBlock) -> None:
         )
         return
 
-    options = extract_options(block.body)
-    if not options:
+    if kind == "none":
         dpg.add_text("No options or numeric values detected for this question.", parent="control_region")
         return
 
+    options = payload
+
     selected_display: Optional[str] = None
     display_to_match: Dict[str, str] = {}
     for opt in options:
@@ -348,7 +474,7 @@ def rebuild_controls(block_index: int, block: QuestionBlock) -> None:
     dpg.add_text("Choose an option:", parent="control_region")
     dpg.add_radio_button(
         tag="option_selector",
-        items=[label for label in display_to_match.keys()],
+        items=list(display_to_match),
         default_value=selected_display,
         callback=on_option_change,
         user_data={"block_index": block_index, "map": display_to_match},
@@ -410,6 +536,88 @@ def render_selection() -> None:
     update_detail_wraps()
 
 
+def _question_row_label(idx: int, block: QuestionBlock) -> str:
+    clean_name = block.name.replace("\r", "").strip()
+    return f"{clean_name} (Token: {block.token or 'None'}) #{idx + 1}"
+
+
+def populate_question_rows() -> None:
+    """Create one hidden selectable per block for the loaded file.
+
+    ``update_question_list`` then only toggles visibility and relabels rows whose
+    modified marker changed, instead of rebuilding the whole list per keystroke.
+    """
+
+    state.visible_indices = set()
+    state.row_labels = {}
+    state.checked_rows = set()
+    # Block names and tokens do not change after load, so the row text is built once.
+    state.base_labels = [_question_row_label(idx, block) for idx, block in enumerate(state.blocks)]
+    if not dpg.does_item_exist("question_list_container"):
+        return
+
+    dpg.delete_item("question_list_container", children_only=True)
+    for idx in range(len(state.blocks)):
+        selectable_tag = f"question_item_{idx}"
+        dpg.add_selectable(
+            tag=selectable_tag,
+            label="",
+            callback=on_question_selected,
+            user_data={"index": idx, "tag": selectable_tag},
+            parent="question_list_container",
+            show=False,
+        )
+
+
+def _set_question_list_placeholder(message: Optional[str]) -> None:
+    if not dpg.does_item_exist("question_list_placeholder"):
+        return
+    if message is None:
+        dpg.configure_item("question_list_placeholder", show=False)
+    else:
+        dpg.set_value("question_list_placeholder", message)
+        dpg.configure_item("question_list_placeholder", show=True)
+
+
+def _sync_checked_rows(target: Set[int]) -> None:
+    """Highlight exactly ``target`` in the sidebar, touching only rows that change."""
+
+    for idx in state.checked_rows - target:
+        dpg.set_value(f"question_item_{idx}", False)
+    for idx in target - state.checked_rows:
+        dpg.set_value(f"question_item_{idx}", True)
+    state.checked_rows = set(target)
+
+
+def refresh_question_rows(indices: Iterable[int]) -> None:
+    """Relabel only ``indices`` after their modified state changed.
+
+    Hidden rows are relabelled too; ``update_question_list`` skips rows whose
+    cached label already matches when they are shown again.
+    """
+
+    if not dpg.does_item_exist("question_list_container"):
+        return
+
+    modified_theme = ensure_modified_sidebar_theme()
+    with dpg.mutex():
+        for idx in indices:
+            label = state.base_labels[idx]
+            is_modified = idx in state.modified_indices
+            if is_modified:
+                label = f"* {label}"
+            previous_label = state.row_labels.get(idx)
+            if previous_label == label:
+                continue
+            selectable_tag = f"question_item_{idx}"
+            dpg.configure_item(selectable_tag, label=label)
+            dpg.bind_item_theme(selectable_tag, modified_theme if is_modified else None)
+            state.row_labels[idx] = label
+            if idx in state.visible_indices:
+                state.label_to_index.pop(previous_label, None)
+                state.label_to_index[label] = idx
+
+
 def update_question_list(filter_text: str = "") -> None:
     state.label_to_index = {}
     filtered_indices = get_filtered_indices(filter_text)
@@ -418,51 +626,53 @@ def update_question_list(filter_text: str = "") -> None:
     if not dpg.does_item_exist("question_list_container"):
         return
 
-    dpg.delete_item("question_list_container", children_only=True)
+    previously_visible = state.visible_indices
+    state.visible_indices = set(filtered_indices)
+    for idx in previously_visible - state.visible_indices:
+        selectable_tag = f"question_item_{idx}"
+        dpg.configure_item(selectable_tag, show=False)
+        if idx in state.checked_rows:
+            dpg.set_value(selectable_tag, False)
+            state.checked_rows.discard(idx)
+
     if not filtered_indices:
         if not filter_text.strip():
             if state.blocks:
-                dpg.add_text("No questions available in this file.", parent="question_list_container")
+                _set_question_list_placeholder("No questions available in this file.")
             else:
-                dpg.add_text("No file loaded. Open an NVRAM export to view questions.", parent="question_list_container")
+                _set_question_list_placeholder("No file loaded. Open an NVRAM export to view questions.")
             append_log("No questions are available to display.")
         else:
-            dpg.add_text("No questions match the current filter.", parent="question_list_container")
+            _set_question_list_placeholder("No questions match the current filter.")
         return
+    _set_question_list_placeholder(None)
 
     modified_theme = ensure_modified_sidebar_theme()
     chosen_index: Optional[int] = None
     label_by_index: Dict[int, str] = {}
 
     for idx in filtered_indices:
-        block = state.blocks[idx]
-        clean_name = block.name.replace("\r", "").strip()
-        label = f"{clean_name} (Token: {block.token or 'None'}) #{idx + 1}"
-        if idx in state.modified_indices:
+        label = state.base_labels[idx]
+        is_modified = idx in state.modified_indices
+        if is_modified:
             label = f"* {label}"
         label_by_index[idx] = label
         state.label_to_index[label] = idx
         selectable_tag = f"question_item_{idx}"
-        dpg.add_selectable(
-            tag=selectable_tag,
-            label=label,
-            callback=on_question_selected,
-            user_data={"index": idx, "label": label, "tag": selectable_tag},
-            parent="question_list_container",
-        )
-        if idx in state.modified_indices and modified_theme is not None:
-            dpg.bind_item_theme(selectable_tag, modified_theme)
-
-    selection_set = [idx for idx in state.selected_indices if idx in filtered_indices]
+        if state.row_labels.get(idx) != label:
+            dpg.configure_item(selectable_tag, label=label, show=True)
+            dpg.bind_item_theme(selectable_tag, modified_theme if is_modified else None)
+            state.row_labels[idx] = label
+        elif idx not in previously_visible:
+            dpg.configure_item(selectable_tag, show=True)
+
+    selection_set = [idx for idx in state.selected_indices if idx in state.visible_indices]
     if not selection_set:
         selection_set = [filtered_indices[0]]
         state.selected_index = selection_set[0]
         state.selected_indices = [selection_set[0]]
 
-    for idx in selection_set:
-        tag = f"question_item_{idx}"
-        if dpg.does_item_exist(tag):
-            dpg.set_value(tag, True)
+    _sync_checked_rows(set(selection_set))
 
     if len(selection_set) == 1:
         chosen_index = selection_set[0]
@@ -479,16 +689,20 @@ def update_question_list(filter_text: str = "") -> None:
     update_batch_indicator()
 
 
+_viewport_client_width = getattr(dpg, "get_viewport_client_width", None)
+_viewport_client_height = getattr(dpg, "get_viewport_client_height", None)
+_viewport_width = getattr(dpg, "get_viewport_width", None)
+_viewport_height = getattr(dpg, "get_viewport_height", None)
+
+
 def _get_viewport_dimensions() -> Tuple[int, int]:
-    viewport_client_width = getattr(dpg, "get_viewport_client_width", None)
-    viewport_client_height = getattr(dpg, "get_viewport_client_height", None)
-    viewport_width = viewport_client_width() if viewport_client_width else 0
-    viewport_height = viewport_client_height() if viewport_client_height else 0
+    viewport_width = _viewport_client_width() if _viewport_client_width else 0
+    viewport_height = _viewport_client_height() if _viewport_client_height else 0
 
     if not viewport_width:
-        viewport_width = dpg.get_viewport_width() if hasattr(dpg, "get_viewport_width") else 0
+        viewport_width = _viewport_width() if _viewport_width else 0
     if not viewport_height:
-        viewport_height = dpg.get_viewport_height() if hasattr(dpg, "get_viewport_height") else 0
+        viewport_height = _viewport_height() if _viewport_height else 0
 
     if not viewport_width:
         viewport_width = DEFAULT_VIEWPORT_WIDTH
@@ -499,7 +713,12 @@ def _get_viewport_dimensions() -> Tuple[int, int]:
 
 
 def _calculate_layout_metrics() -> Dict[str, int]:
-    viewport_width, viewport_height = _get_viewport_dimensions()
+    return _layout_metrics_for(*_get_viewport_dimensions())
+
+
+@lru_cache(maxsize=8)
+def _layout_metrics_for(viewport_width: int, viewport_height: int) -> Dict[str, int]:
+    # Cached per viewport size; callers must treat the returned dict as read-only.
 
     sidebar_width = int(max(SIDEBAR_WIDTH_MIN, min(viewport_width * SIDEBAR_WIDTH_RATIO, SIDEBAR_WIDTH_MAX)))
     gutter = int(max(GUTTER_MIN, min(viewport_width * GUTTER_RATIO, GUTTER_MAX)))
@@ -528,54 +747,87 @@ def _calculate_layout_metrics() -> Dict[str, int]:
     }
 
 
-def update_detail_wraps() -> None:
-    layout = _calculate_layout_metrics()
-    content_width = layout["detail_width"]
+LAYOUT_TAGS = (
+    "question_name",
+    "question_token",
+    "help_text",
+    "bypass_crc_warning",
+    "unsafe_crc_warning",
+    "control_region",
+    "sidebar",
+    "batch_alert_label",
+    "editor_panel",
+    "question_list_container",
+    "console_panel",
+)
+
+
+def _layout_item_config(layout: Dict[str, int]) -> List[Tuple[str, Dict[str, int]]]:
     wrap_width = layout["wrap_width"]
-    if dpg.does_item_exist("question_name"):
-        dpg.configure_item("question_name", wrap=wrap_width)
-    if dpg.does_item_exist("question_token"):
-        dpg.configure_item("question_token", wrap=wrap_width)
-    if dpg.does_item_exist("help_text"):
-        dpg.configure_item("help_text", width=wrap_width)
-    if dpg.does_item_exist("bypass_crc_warning"):
-        dpg.configure_item("bypass_crc_warning", wrap=wrap_width)
-    if dpg.does_item_exist("unsafe_crc_warning"):
-        dpg.configure_item("unsafe_crc_warning", wrap=wrap_width)
-    if dpg.does_item_exist("control_region"):
-        dpg.configure_item("control_region", width=content_width)
-    if dpg.does_item_exist("sidebar"):
-        dpg.configure_item("sidebar", height=layout["available_height"], width=layout["sidebar_width"])
-    if dpg.does_item_exist("batch_alert_label"):
-        sidebar_wrap = max(260, layout["sidebar_width"] - 40)
-        dpg.configure_item("batch_alert_label", wrap=sidebar_wrap)
-    if dpg.does_item_exist("editor_panel"):
-        dpg.configure_item("editor_panel", height=layout["available_height"])
-    if dpg.does_item_exist("control_region"):
-        dpg.configure_item("control_region", height=layout["control_region_height"])
-    if dpg.does_item_exist("question_list_container"):
-        dpg.configure_item(
+    return [
+        ("question_name", {"wrap": wrap_width}),
+        ("question_token", {"wrap": wrap_width}),
+        ("help_text", {"width": wrap_width}),
+        ("bypass_crc_warning", {"wrap": wrap_width}),
+        ("unsafe_crc_warning", {"wrap": wrap_width}),
+        ("control_region", {"width": layout["detail_width"], "height": layout["control_region_height"]}),
+        ("sidebar", {"height": layout["available_height"], "width": layout["sidebar_width"]}),
+        ("batch_alert_label", {"wrap": max(260, layout["sidebar_width"] - 40)}),
+        ("editor_panel", {"height": layout["available_height"]}),
+        (
             "question_list_container",
-            height=layout["sidebar_list_height"],
-            width=layout["sidebar_width"] - 8,
-        )
-    if dpg.does_item_exist("console_panel"):
-        dpg.configure_item("console_panel", height=layout["console_panel_height"])
+            {"height": layout["sidebar_list_height"], "width": layout["sidebar_width"] - 8},
+        ),
+        ("console_panel", {"height": layout["console_panel_height"]}),
+    ]
 
 
-def on_viewport_resize(sender: int, app_data: object) -> None:
+def update_detail_wraps() -> None:
+    layout = _calculate_layout_metrics()
+    # Layout items are created once in build_ui, so existence is probed once and
+    # the configure calls are skipped entirely while the viewport size is unchanged.
+    if state.layout_tags is None:
+        state.layout_tags = frozenset(tag for tag in LAYOUT_TAGS if dpg.does_item_exist(tag))
+    elif layout == state.applied_layout:
+        return
+
+    for tag, config in _layout_item_config(layout):
+        if tag in state.layout_tags:
+            dpg.configure_item(tag, **config)
+    state.applied_layout = layout
+
+
+def _apply_pending_resize() -> None:
+    state.resize_pending = False
     update_detail_wraps()
 
 
-def on_search(sender: int, app_data: str) -> None:
-    filter_text = app_data.strip()
+def on_viewport_resize(sender: int, app_data: object) -> None:
+    # Drag-resizing fires many events per frame; coalesce them into one relayout.
+    if state.resize_pending:
+        return
+    state.resize_pending = True
+    schedule_frame_task(1, _apply_pending_resize)
+
+
+def _apply_search(generation: int, filter_text: str) -> None:
+    # Runs from run_due_frame_tasks on the render loop, the same thread that drains
+    # item callbacks, so the row state it rebuilds cannot change underneath it.
+    if generation != state.search_generation:
+        return
     state.selected_index = None
     state.selected_indices = []
-    if dpg.does_item_exist("question_list_container"):
-        dpg.delete_item("question_list_container", children_only=True)
     update_question_list(filter_text)
 
 
+def on_search(sender: int, app_data: str) -> None:
+    # Fires per keystroke; only the last text typed within the debounce window is applied.
+    state.search_generation += 1
+    generation = state.search_generation
+    filter_text = app_data.strip()
+    schedule_frame_task(SEARCH_DEBOUNCE_FRAMES, lambda: _apply_search(generation, filter_text))
+
+
 def on_clear_selection(sender: int, app_data: object) -> None:
     filter_text = ""
     if dpg.does_item_exist("search_input"):
@@ -623,12 +875,11 @@ def on_question_selected(sender: Optional[int], app_data: object, user_data: Opt
     state.selected_index = block_index
     state.selected_indices = [block_index]
 
-    if dpg.does_item_exist("question_list_container"):
-        for child in dpg.get_item_children("question_list_container", 1) or []:
-            if item_tag and child == item_tag:
-                dpg.set_value(child, True)
-            else:
-                dpg.set_value(child, False)
+    if state.visible_indices:
+        _sync_checked_rows({block_index})
+        if item_tag and dpg.does_item_exist(item_tag):
+            # Clicking an already highlighted row toggles it off; keep it highlighted.
+            dpg.set_value(item_tag, True)
 
     block = state.blocks[block_index]
     render_selection()
@@ -692,26 +943,36 @@ def on_batch_option_apply(sender: int, app_data: object, user_data: Optional[Dic
     handle_change_request(pending)
 
 
-def parse_numeric_input(block: QuestionBlock, raw_value: Union[str, int]) -> Tuple[Optional[int], Optional[str]]:
-    conversion_note: Optional[str] = None
-
+def _parse_raw_numeric(raw_value: Union[str, int]) -> Tuple[Optional[int], Optional[str]]:
     if isinstance(raw_value, int):
-        parsed_value = raw_value
-    else:
-        text_value = raw_value.strip()
-        if not text_value:
-            return None, "Please enter a value before updating."
+        return raw_value, None
 
-        try:
-            parsed_value, conversion_note = validate_numeric_input(text_value)
-        except ValueError as exc:
-            return None, str(exc)
+    text_value = raw_value.strip()
+    if not text_value:
+        return None, "Please enter a value before updating."
 
-    if block.min_value is not None and parsed_value < block.min_value:
-        return None, _range_error_message(block.min_value, block.max_value)
+    try:
+        return validate_numeric_input(text_value)
+    except ValueError as exc:
+        return None, str(exc)
 
-    if block.max_value is not None and parsed_value > block.max_value:
-        return None, _range_error_message(block.min_value, block.max_value)
+
+def _block_range_error(block: QuestionBlock, value: int) -> Optional[str]:
+    if block.min_value is not None and value < block.min_value:
+        return _range_error_message(block.min_value, block.max_value)
+    if block.max_value is not None and value > block.max_value:
+        return _range_error_message(block.min_value, block.max_value)
+    return None
+
+
+def parse_numeric_input(block: QuestionBlock, raw_value: Union[str, int]) -> Tuple[Optional[int], Optional[str]]:
+    parsed_value, conversion_note = _parse_raw_numeric(raw_value)
+    if parsed_value is None:
+        return None, conversion_note
+
+    range_error = _block_range_error(block, parsed_value)
+    if range_error is not None:
+        return None, range_error
 
     return parsed_value, conversion_note
 
@@ -725,27 +986,27 @@ def on_batch_value_apply(sender: int, app_data: object, user_data: Optional[Dict
         append_log("Batch value input not available.")
         return
 
-    raw_value = dpg.get_value("batch_value_input")
+    # The input text is the same for every block, so parse it once and only
+    # range-check per block.
+    parsed_value, conversion_note = _parse_raw_numeric(dpg.get_value("batch_value_input"))
     eligible_indices: List[int] = []
     skipped: List[Tuple[str, str]] = []
-    conversion_note: Optional[str] = None
-    parsed_value: Optional[int] = None
 
     for idx in state.selected_indices:
         block = state.blocks[idx]
-        if not VALUE_PATTERN.search(block.body):
+        if classify_body(block.body)[0] != "value":
             skipped.append((block.name, "block does not support numeric values."))
             continue
 
-        value, note = parse_numeric_input(block, raw_value)
-        if value is None:
-            skipped.append((block.name, note or "Invalid value for this block."))
+        if parsed_value is None:
+            reason: Optional[str] = conversion_note or "Invalid value for this block."
+        else:
+            reason = _block_range_error(block, parsed_value)
+        if reason is not None:
+            skipped.append((block.name, reason))
             continue
 
         eligible_indices.append(idx)
-        parsed_value = value
-        if note and conversion_note is None:
-            conversion_note = note
 
     for name, reason in skipped:
         append_log(f"Ignoring '{name}': {reason}")
@@ -773,22 +1034,26 @@ def handle_change_request(change: "PendingChange") -> None:
 
 
 def apply_pending_change(change: "PendingChange") -> None:
+    failed: Set[int] = set()
+
+    def log_skipped(idx: int, exc: ValueError) -> None:
+        failed.add(idx)
+        append_log(f"Skipped '{state.blocks[idx].name}': {exc}")
+
+    updated_blocks = apply_changes(
+        state.manager,
+        state.blocks,
+        change.block_indices,
+        change.option_match_value if change.action == "option" else None,
+        change.new_value if change.action == "value" else None,
+        on_error=log_skipped,
+    )
     successful = 0
     for idx in change.block_indices:
-        block = state.blocks[idx]
-        try:
-            updated_blocks = apply_changes(
-                state.manager,
-                state.blocks,
-                [idx],
-                change.option_match_value if change.action == "option" else None,
-                change.new_value if change.action == "value" else None,
-            )
-        except ValueError as exc:
-            append_log(f"Skipped '{block.name}': {exc}")
+        if idx in failed:
             continue
-
         updated_block = updated_blocks[idx]
+        state.original_blocks.setdefault(idx, state.blocks[idx])
         state.blocks[idx] = updated_block
         state.manager.blocks[idx] = updated_block
         state.modified_indices.add(idx)
@@ -841,6 +1106,7 @@ def on_value_change(sender: int, app_data: object, user_data: Dict[str, object])
 
 def on_toggle_bypass_crc(sender: int, app_data: object) -> None:
     bypass_active = bool(app_data)
+    state.crc_ui.bypass = bypass_active
     if dpg.does_item_exist("bypass_crc_mode_selector"):
         dpg.configure_item("bypass_crc_mode_selector", enabled=bypass_active)
 
@@ -851,8 +1117,8 @@ def on_toggle_bypass_crc(sender: int, app_data: object) -> None:
 
 def on_force_crc_toggle(sender: int, app_data: object) -> None:
     force_enabled = bool(app_data)
-    mode = _selected_bypass_mode()
-    unsafe_mode = _is_unsafe_crc_mode(mode)
+    state.crc_ui.force = force_enabled
+    unsafe_mode = _is_unsafe_crc_mode(state.crc_ui.mode)
     has_crc = getattr(state.manager, "has_crc_marker", False)
 
     if not force_enabled:
@@ -870,19 +1136,18 @@ def on_force_crc_toggle(sender: int, app_data: object) -> None:
 
 
 def on_crc_mode_change(sender: int, app_data: object) -> None:
-    mode = _selected_bypass_mode()
-    if _is_unsafe_crc_mode(mode):
+    state.crc_ui.mode = BYPASS_MODE_LABELS.get(str(app_data), "empty")
+    if _is_unsafe_crc_mode(state.crc_ui.mode):
         append_log(
             "Unsafe CRC bypass selected: removing or emptying the HIICrc32 header may make the file unusable."
         )
     _update_crc_warning_state()
 
 
-def _selected_bypass_mode() -> str:
-    if dpg.does_item_exist("bypass_crc_mode_selector"):
-        label = str(dpg.get_value("bypass_crc_mode_selector"))
-        return BYPASS_MODE_LABELS.get(label, "empty")
-    return "empty"
+def _clear_force_crc_bypass() -> None:
+    state.crc_ui.force = False
+    if dpg.does_item_exist("force_crc_bypass_checkbox"):
+        dpg.set_value("force_crc_bypass_checkbox", False)
 
 
 def _is_unsafe_crc_mode(mode: str) -> bool:
@@ -890,20 +1155,22 @@ def _is_unsafe_crc_mode(mode: str) -> bool:
 
 
 def _update_crc_warning_state() -> None:
-    bypass_active = bool(dpg.get_value("bypass_crc_checkbox")) if dpg.does_item_exist("bypass_crc_checkbox") else False
-    mode = _selected_bypass_mode()
-    unsafe_mode = bypass_active and _is_unsafe_crc_mode(mode)
+    bypass_active = state.crc_ui.bypass
+    unsafe_mode = bypass_active and _is_unsafe_crc_mode(state.crc_ui.mode)
 
-    if dpg.does_item_exist("bypass_crc_warning"):
-        dpg.configure_item("bypass_crc_warning", show=bypass_active)
+    # One render-thread lock for the whole group of updates, so a frame never
+    # shows the warnings half toggled.
+    with dpg.mutex():
+        if dpg.does_item_exist("bypass_crc_warning"):
+            dpg.configure_item("bypass_crc_warning", show=bypass_active)
 
-    if dpg.does_item_exist("unsafe_crc_warning"):
-        dpg.configure_item("unsafe_crc_warning", show=unsafe_mode)
+        if dpg.does_item_exist("unsafe_crc_warning"):
+            dpg.configure_item("unsafe_crc_warning", show=unsafe_mode)
 
-    if dpg.does_item_exist("force_crc_bypass_checkbox"):
-        dpg.configure_item("force_crc_bypass_checkbox", show=unsafe_mode)
+        if dpg.does_item_exist("force_crc_bypass_checkbox"):
+            dpg.configure_item("force_crc_bypass_checkbox", show=unsafe_mode)
         if not unsafe_mode:
-            dpg.set_value("force_crc_bypass_checkbox", False)
+            _clear_force_crc_bypass()
 
 
 def on_save(sender: int, app_data: object) -> None:
@@ -913,11 +1180,9 @@ def on_save(sender: int, app_data: object) -> None:
 
     total_changes = len(state.modified_indices)
     summary = f"You are about to modify {total_changes} option(s). Do you want to continue?"
-    bypass_crc = bool(dpg.get_value("bypass_crc_checkbox")) if dpg.does_item_exist("bypass_crc_checkbox") else False
-    bypass_crc_mode = _selected_bypass_mode()
-    force_crc_bypass = (
-        bool(dpg.get_value("force_crc_bypass_checkbox")) if dpg.does_item_exist("force_crc_bypass_checkbox") else False
-    )
+    bypass_crc = state.crc_ui.bypass
+    bypass_crc_mode = state.crc_ui.mode
+    force_crc_bypass = state.crc_ui.force
     if bypass_crc:
         summary += "\n\nCRC bypass is enabled."
         if _is_unsafe_crc_mode(bypass_crc_mode):
@@ -932,7 +1197,7 @@ def on_save(sender: int, app_data: object) -> None:
         lines = ["", "Changes to be saved:"]
         for idx in sorted(state.modified_indices):
             current = state.blocks[idx]
-            original = state.original_blocks[idx] if idx < len(state.original_blocks) else None
+            original = state.original_blocks.get(idx)
             before = _describe_block_setting(original)
             after = _describe_block_setting(current)
             token_display = current.token or "None"
@@ -955,11 +1220,9 @@ def perform_save(sender: int, app_data: object) -> None:
         _hide_save_confirm_modal(sender, app_data)
         return
 
-    bypass_crc = False
-    if dpg.does_item_exist("bypass_crc_checkbox"):
-        bypass_crc = bool(dpg.get_value("bypass_crc_checkbox"))
-    bypass_crc_mode = _selected_bypass_mode()
-    force_crc_bypass = bool(dpg.get_value("force_crc_bypass_checkbox")) if dpg.does_item_exist("force_crc_bypass_checkbox") else False
+    bypass_crc = state.crc_ui.bypass
+    bypass_crc_mode = state.crc_ui.mode
+    force_crc_bypass = state.crc_ui.force
 
     new_text = state.manager.rebuild_text(state.blocks)
     try:
@@ -980,17 +1243,16 @@ def perform_save(sender: int, app_data: object) -> None:
         append_log(
             f"CRC bypass active ({bypass_crc_mode}): saved without restoring the original checksum."
         )
-    state.original_blocks = list(state.blocks)
+    saved_indices = list(state.modified_indices)
+    state.original_blocks.clear()
     state.modified_indices.clear()
-    if dpg.does_item_exist("search_input"):
-        update_question_list(dpg.get_value("search_input") or "")
+    refresh_question_rows(saved_indices)
     append_log("Cleared change markers; on-disk file now matches the UI.")
     _hide_save_confirm_modal(sender, app_data)
 
 
 def on_force_crc_cancel(sender: int, app_data: object) -> None:
-    if dpg.does_item_exist("force_crc_bypass_checkbox"):
-        dpg.set_value("force_crc_bypass_checkbox", False)
+    _clear_force_crc_bypass()
     dpg.configure_item("force_crc_modal", show=False)
 
 
@@ -1014,18 +1276,25 @@ def on_file_selected(file_path: Union[str, Path]) -> None:
         dpg.set_value("load_error_text", f"Failed to import file:\n{exc}")
         dpg.set_value("loaded_file_label", "No file loaded (failed to parse)")
         state.blocks = []
-        state.original_blocks = []
+        state.original_blocks = {}
+        state.normalized_names = []
+        state.word_masks = {}
         state.modified_indices = set()
+        populate_question_rows()
         update_question_list("")
         return
 
     state.blocks = list(state.manager.blocks)
-    state.original_blocks = list(state.manager.blocks)
+    state.original_blocks = {}
+    state.normalized_names = [_normalize_search_text(block.name) for block in state.blocks]
+    state.word_masks = {}
     state.modified_indices = set()
     state.selected_index = None
     state.selected_indices = []
+    state.search_generation += 1
     if dpg.does_item_exist("search_input"):
         dpg.set_value("search_input", "")
+    populate_question_rows()
     block_count = len(state.blocks)
     label_text = f"Loaded: {resolved_path.name} ({block_count} blocks)"
     if block_count == 0:
@@ -1047,8 +1316,6 @@ def on_file_selected(file_path: Union[str, Path]) -> None:
         state.selected_index = first_index
         state.selected_indices = [first_index]
         selectable_tag = f"question_item_{first_index}"
-        if dpg.does_item_exist(selectable_tag):
-            dpg.set_value(selectable_tag, True)
         on_question_selected(None, None, {"index": first_index, "tag": selectable_tag})
     else:
         dpg.set_value("loaded_file_label", f"Loaded: {resolved_path.name} (no questions detected)")
@@ -1162,6 +1429,7 @@ def build_ui() -> None:
                     show=False,
                     wrap=300,
                 )
+                dpg.add_text("", tag="question_list_placeholder", show=False)
                 dpg.add_child_window(
                     tag="question_list_container",
                     autosize_x=True,
@@ -1228,7 +1496,7 @@ def build_ui() -> None:
                     dpg.add_radio_button(
                         tag="bypass_crc_mode_selector",
                         items=list(BYPASS_MODE_LABELS.keys()),
-                        default_value="Version placeholder",
+                        default_value=DEFAULT_BYPASS_MODE_LABEL,
                         indent=12,
                         horizontal=True,
                         callback=on_crc_mode_change,
@@ -1286,6 +1554,9 @@ def build_ui() -> None:
             dpg.add_button(label="Proceed anyway", callback=on_force_crc_confirm)
 
     dpg.create_viewport(title="NVRAM Tweaker UI", width=1200, height=840, resizable=True)
+    # Callbacks are queued and run from the loop below so that they share the main
+    # thread with run_due_frame_tasks instead of racing it from a callback thread.
+    dpg.configure_app(manual_callback_management=True)
     dpg.setup_dearpygui()
     dpg.show_viewport()
     update_detail_wraps()
@@ -1294,7 +1565,10 @@ def build_ui() -> None:
         dpg.set_viewport_resize_callback(on_viewport_resize)
     dpg.set_primary_window("primary_window", True)
     append_log("Ready. Load an NVRAM file to start.")
-    dpg.start_dearpygui()
+    while dpg.is_dearpygui_running():
+        dpg.run_callbacks(dpg.get_callback_queue())
+        run_due_frame_tasks()
+        dpg.render_dearpygui_frame()
     dpg.destroy_context()
 
 
@@ -8,48 +8,65 @@ from __future__ import annotations
 
 import logging
 import re
+import sys
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 from nvram_structures import BlockField, OptionField, QuestionBlock, ValueField
 
 LOGGER = logging.getLogger(__name__)
 
-BLOCK_PATTERN = re.compile(
-    r"""
-    (?P<header_line>^\s*(?:[#;/]{0,2}\s*)?Setup\s+Question\s*=\s*(?P<name>[^\r\n]*?))
-    (?P<header_ending>\r?\n|\r|\n)
-    (?P<body>
-        (?:
-            (?!
-                ^\s*(?:[#;/]{0,2}\s*)?Setup\s+Question\b
-            )
-            [\s\S]
-        )*?
-    )
-    (?=^\s*(?:[#;/]{0,2}\s*)?Setup\s+Question\b|\Z)
-    """,
-    re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+# Patterns are compiled with re.ASCII: exports are ASCII text, and ASCII-only
+# classes and case folding match faster than the Unicode defaults.
+# find_blocks finds headers with one SETUP_HEADER_PATTERN scan, then ends each body
+# at the next BLOCK_END_PATTERN hit (a "Setup Question" line, valid header or not)
+# and slices it by offset. Both share one spelling of the header prefix.
+_SETUP_QUESTION_PREFIX = r"^\s*(?:[#;/]{0,2}\s*)?Setup\s+Question"
+SETUP_HEADER_PATTERN = re.compile(
+    rf"(?P<header_line>{_SETUP_QUESTION_PREFIX}\s*=\s*(?P<name>[^\r\n]*?))(?P<header_ending>\r?\n|\r|\n)",
+    re.IGNORECASE | re.MULTILINE | re.ASCII,
 )
+BLOCK_END_PATTERN = re.compile(rf"{_SETUP_QUESTION_PREFIX}\b", re.IGNORECASE | re.MULTILINE | re.ASCII)
 HELP_PATTERN = re.compile(
     r"^\s*(?:[#;/]{0,2}\s*)?Help\s+String\s*=\s*(?P<help>[^\r\n]*)",
-    re.MULTILINE,
+    re.MULTILINE | re.ASCII,
 )
 TOKEN_PATTERN = re.compile(
     r"^\s*(?:[#;/]{0,2}\s*)?Token\s*=\s*(?P<token>.+)",
-    re.MULTILINE,
+    re.MULTILINE | re.ASCII,
 )
-VALUE_PATTERN = re.compile(r"Value\s*=\s*<(?P<value>[+-]?(?:0x[0-9A-Fa-f]+|\d+))>\s*")
+VALUE_PATTERN = re.compile(r"Value\s*=\s*<(?P<value>[+-]?(?:0x[0-9A-Fa-f]+|\d+))>\s*", re.ASCII)
+# Option lines start after any of "\r\n", "\r" or "\n" (MULTILINE ``^`` alone only
+# recognises "\n"), and labels stop at either break character, so CR-only
+# exports yield one match per line. A label may be empty only before "\r", which
+# keeps "[00]" lines in CRLF and CR files as options, as they always were.
 OPTION_LINE_PATTERN = re.compile(
-    r"(?P<prefix>\s*(?:[#;/]{0,2}\s*)?(?:Options?|Option)?\s*=?\s*)?"
-    r"(?P<star>\*)?\[(?P<code>[^\]]+)\](?P<label>.+)"
+    r"(?:^|(?<=\r))(?P<prefix>[ \t]*(?:[#;/]{0,2}[ \t]*)?(?:Options?|Option)?[ \t]*=?[ \t]*)?"
+    r"(?P<star>\*)?\[(?P<code>[^\]\r\n]+)\](?P<label>[^\r\n]+|(?=\r))",
+    re.MULTILINE | re.ASCII,
+)
+# Min and Max are collected in one pass: a match spans only the key, "=" and the
+# digits, so one key's match can never contain the other key's first match.
+# Help String and Token stay separate searches, because their "\s*=\s*" may run
+# across a line break and swallow the next line.
+RANGE_PATTERN = re.compile(
+    r"\b(?P<key>Min|Max)\s*=\s*(?P<value>-?(?:0x[0-9A-Fa-f]+|\d+))",
+    re.IGNORECASE | re.ASCII,
 )
-MIN_PATTERN = re.compile(r"\bMin\s*=\s*(?P<min>-?(?:0x[0-9A-Fa-f]+|\d+))", re.IGNORECASE)
-MAX_PATTERN = re.compile(r"\bMax\s*=\s*(?P<max>-?(?:0x[0-9A-Fa-f]+|\d+))", re.IGNORECASE)
+SETUP_HEADER_CORE_PATTERN = re.compile(
+    r"(?P<prefix>(?:[#;/]{0,2}\s*)?Setup\s+Question\s*=\s*)(?P<name>.*)",
+    re.IGNORECASE | re.ASCII,
+)
+LEADING_WHITESPACE_PATTERN = re.compile(r"\s*", re.ASCII)
+INLINE_COMMENT_PATTERN = re.compile(r"(\s*(?:[#;/]{1,2}.*))$", re.ASCII)
+TOKEN_COMMENT_PATTERN = re.compile(r"//.*")
 TOKEN_VALIDATION_PATTERN = re.compile(
-    r"^(0x[0-9A-Fa-f]+|[0-9A-Fa-f]+)(\s*,\s*(0x[0-9A-Fa-f]+|[0-9A-Fa-f]+))*$"
+    r"^(0x[0-9A-Fa-f]+|[0-9A-Fa-f]+)(\s*,\s*(0x[0-9A-Fa-f]+|[0-9A-Fa-f]+))*$",
+    re.ASCII,
 )
-NUMERIC_INPUT_PATTERN = re.compile(r"^[+-]?(?:0x[0-9A-Fa-f]+|\d+)$")
-SETUP_BOUNDARY_PATTERN = re.compile(r"setup\s+question", re.IGNORECASE)
+BODY_LINE_PATTERN = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+")
+NUMERIC_INPUT_PATTERN = re.compile(r"^[+-]?(?:0x[0-9A-Fa-f]+|\d+)$", re.ASCII)
+SETUP_BOUNDARY_PATTERN = re.compile(r"setup\s+question", re.IGNORECASE | re.ASCII)
 
 
 def find_blocks(text: str) -> tuple[List[QuestionBlock], str]:
@@ -60,47 +77,50 @@ def find_blocks(text: str) -> tuple[List[QuestionBlock], str]:
     """
 
     blocks: List[QuestionBlock] = []
-    matches = list(BLOCK_PATTERN.finditer(text))
+    matches = list(SETUP_HEADER_PATTERN.finditer(text))
     if not matches:
         _warn_on_skipped_range(text, 0, len(text))
         trailing_text = text
         return blocks, trailing_text
     cursor = 0
+    # Matches arrive in order, so line numbers are counted incrementally from the
+    # previous block start instead of rescanning the text from offset 0 each time.
+    line_number = 1
+    counted_to = 0
 
     for match in matches:
+        body_start = match.end()
+        end_match = BLOCK_END_PATTERN.search(text, body_start)
+        block_end = end_match.start() if end_match else len(text)
         pre_separator = text[cursor:match.start()]
-        _warn_on_skipped_range(text, cursor, match.start())
-        line_number = text.count("\n", 0, match.start()) + 1
+        # Back-to-back blocks (the usual case) leave no gap to inspect.
+        if pre_separator:
+            _warn_on_skipped_range(text, cursor, match.start())
+        line_number += text.count("\n", counted_to, match.start())
+        counted_to = match.start()
         header_line = match.group("header_line")
-        leading_whitespace = _extract_leading_whitespace(header_line)
+        # Header line endings and the blank lines before headers take only a few
+        # distinct values; interning shares them across all blocks.
+        leading_whitespace = sys.intern(_extract_leading_whitespace(header_line))
         header_without_leading = header_line[len(leading_whitespace) :]
         header_core, inline_comment = _split_inline_comment(header_without_leading)
-        setup_match = re.match(
-            r"(?P<prefix>(?:[#;/]{0,2}\s*)?Setup\s+Question\s*=\s*)(?P<name>.*)",
-            header_core,
-            re.IGNORECASE,
-        )
+        setup_match = SETUP_HEADER_CORE_PATTERN.match(header_core)
         if not setup_match:
             continue
-        body = match.group("body")
-        help_match = HELP_PATTERN.search(body)
-        help_text = help_match.group("help") if help_match else None
+        body = text[body_start:block_end]
+        help_text, raw_token, raw_min, raw_max = _scan_body_fields(body)
         raw_name = setup_match.group("name").strip()
         name = raw_name
-        token_match = TOKEN_PATTERN.search(body)
-        min_match = MIN_PATTERN.search(body)
-        max_match = MAX_PATTERN.search(body)
-        min_value = _parse_range_value(min_match, "min")
-        max_value = _parse_range_value(max_match, "max")
-        cursor = match.end()
+        min_value = _parse_range_value(raw_min)
+        max_value = _parse_range_value(raw_max)
+        cursor = block_end
         cleaned_token: Optional[str] = None
-        if token_match:
+        if raw_token is not None:
             try:
-                cleaned_token = _clean_token(token_match.group("token"))
+                cleaned_token = _clean_token(raw_token)
             except ValueError as exc:
                 LOGGER.warning("Token parsing skipped for '%s': %s", name, exc)
                 cleaned_token = None
-        fields = _parse_fields(body)
         blocks.append(
             QuestionBlock(
                 name=name,
@@ -110,31 +130,51 @@ def find_blocks(text: str) -> tuple[List[QuestionBlock], str]:
                 min_value=min_value,
                 max_value=max_value,
                 start=match.start(),
-                end=match.end(),
+                end=block_end,
                 line_number=line_number,
                 pre_separator=pre_separator,
                 post_separator="",
                 setup_line=header_core,
-                line_ending=match.group("header_ending"),
+                line_ending=sys.intern(match.group("header_ending")),
                 leading_whitespace=leading_whitespace,
                 inline_comment=inline_comment,
-                fields=fields,
+                field_parser=parse_fields,
             )
         )
     trailing_text = text[cursor:]
-    _warn_on_skipped_range(text, cursor, len(text))
+    if trailing_text:
+        _warn_on_skipped_range(text, cursor, len(text))
     return blocks, trailing_text
 
 
+def _scan_body_fields(body: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Return the first help, token, min and max values in ``body`` (``None`` when absent)."""
+
+    help_match = HELP_PATTERN.search(body)
+    help_text = help_match.group("help") if help_match else None
+    token_match = TOKEN_PATTERN.search(body)
+    raw_token = token_match.group("token") if token_match else None
+
+    raw_min: Optional[str] = None
+    raw_max: Optional[str] = None
+    for range_match in RANGE_PATTERN.finditer(body):
+        if range_match.group("key").lower() == "min":
+            if raw_min is None:
+                raw_min = range_match.group("value")
+        elif raw_max is None:
+            raw_max = range_match.group("value")
+        if raw_min is not None and raw_max is not None:
+            break
+
+    return help_text, raw_token, raw_min, raw_max
+
+
 def _extract_leading_whitespace(line: str) -> str:
-    leading_match = re.match(r"^(\s*)", line)
-    if not leading_match:
-        return ""
-    return leading_match.group(1)
+    return LEADING_WHITESPACE_PATTERN.match(line).group()
 
 
 def _split_inline_comment(line: str) -> tuple[str, str]:
-    comment_match = re.search(r"(\s*(?:[#;/]{1,2}.*))$", line)
+    comment_match = INLINE_COMMENT_PATTERN.search(line)
     if not comment_match or comment_match.start(1) == 0:
         return line, ""
     start_index = comment_match.start(1)
@@ -158,11 +198,10 @@ def _warn_on_skipped_range(text: str, start: int, end: int) -> None:
     )
 
 
-def _parse_range_value(match: Optional[re.Match[str]], group_name: str) -> Optional[int]:
-    if not match:
+def _parse_range_value(raw_value: Optional[str]) -> Optional[int]:
+    if raw_value is None:
         return None
 
-    raw_value = match.group(group_name)
     try:
         return int(raw_value, 0)
     except ValueError:
@@ -170,7 +209,7 @@ def _parse_range_value(match: Optional[re.Match[str]], group_name: str) -> Optio
 
 
 def _clean_token(raw_token: str) -> str:
-    token_without_comments = re.sub(r"//.*", "", raw_token)
+    token_without_comments = TOKEN_COMMENT_PATTERN.sub("", raw_token)
     cleaned = token_without_comments.strip()
 
     if not cleaned:
@@ -184,31 +223,59 @@ def _clean_token(raw_token: str) -> str:
     return cleaned
 
 
-def _parse_fields(body: str) -> List[BlockField]:
+def _split_body_lines(body: str) -> List[str]:
+    """Split ``body`` after each ``\r\n``, ``\r`` or ``\n``, keeping the line ends.
+
+    This is the same line rule ``OPTION_LINE_PATTERN`` uses, so fields line up with
+    ``OPTION_LINE_PATTERN.finditer(body)`` in the editor. ``str.splitlines`` would
+    also break on ``\x85`` and other separators that can appear inside latin-1
+    decoded labels.
+    """
+
+    return BODY_LINE_PATTERN.findall(body)
+
+
+def _line_ending(line: str) -> str:
+    if line.endswith("\r\n"):
+        return "\r\n"
+    if line.endswith(("\n", "\r")):
+        return line[-1]
+    return ""
+
+
+# Blocks call this on every ``fields`` read instead of storing the result on
+# themselves (they are frozen); the cache keeps repeated reads of a body cheap.
+@lru_cache(maxsize=256)
+def parse_fields(body: str) -> tuple[BlockField, ...]:
+    """Parse the option and ``Value`` lines of a block body, in body order."""
+
     fields: List[BlockField] = []
-    for line in body.splitlines(keepends=True):
-        option_match = OPTION_LINE_PATTERN.match(line)
+    for line in _split_body_lines(body):
+        # Literal probes first: most lines carry neither an option code nor a Value.
+        option_match = OPTION_LINE_PATTERN.match(line) if "[" in line else None
         if option_match:
+            # Exports repeat the same few prefixes, codes and labels thousands of
+            # times; interning lets every OptionField share one copy of each.
             fields.append(
                 OptionField(
-                    prefix=option_match.group("prefix") or "",
-                    code=option_match.group("code"),
-                    label=option_match.group("label").rstrip("\r\n"),
+                    prefix=sys.intern(option_match.group("prefix") or ""),
+                    code=sys.intern(option_match.group("code")),
+                    label=sys.intern(option_match.group("label")),
                     selected=bool(option_match.group("star")),
-                    line_ending="\r\n" if line.endswith("\r\n") else ("\n" if line.endswith("\n") else ""),
+                    line_ending=_line_ending(line),
                 )
             )
             continue
 
-        value_match = VALUE_PATTERN.search(line)
+        value_match = VALUE_PATTERN.search(line) if "Value" in line else None
         if value_match:
             fields.append(
                 ValueField(
                     value=int(value_match.group("value"), 0),
-                    line_ending="\r\n" if line.endswith("\r\n") else ("\n" if line.endswith("\n") else ""),
+                    line_ending=_line_ending(line),
                 )
             )
-    return fields
+    return tuple(fields)
 
 
 def validate_numeric_input(raw_value: str) -> tuple[int, Optional[str]]:
@@ -218,6 +285,11 @@ def validate_numeric_input(raw_value: str) -> tuple[int, Optional[str]]:
     to prevent hidden or malformed input from being applied.
     """
 
+    # Plain decimal input (the common case) cannot contain whitespace or hex
+    # digits and always satisfies NUMERIC_INPUT_PATTERN, so skip the checks.
+    if raw_value.isascii() and raw_value.isdigit():
+        return int(raw_value, 0), None
+
     if any(ch in raw_value for ch in ("\n", "\r", "\t")):
         raise ValueError("Numeric values must not contain tabs or newlines.")
 
@@ -244,9 +316,8 @@ def matches_name(block: QuestionBlock, query: str, exact: bool) -> bool:
 
 
 def selected_option(body: str) -> Optional[str]:
-    for line in body.splitlines():
-        opt_match = OPTION_LINE_PATTERN.match(line)
-        if opt_match and opt_match.group("star"):
+    for opt_match in OPTION_LINE_PATTERN.finditer(body):
+        if opt_match.group("star"):
             code = opt_match.group("code")
             label = opt_match.group("label").rstrip()
             return f"*[{code}]{label}"
@@ -22,12 +22,16 @@ def rebuild_text(blocks: List[QuestionBlock], trailing_text: str = "") -> str:
 
     parts = []
     for block in blocks:
-        parts.append(block.pre_separator)
-        parts.append(block.leading_whitespace)
-        parts.append(block.setup_line)
-        parts.append(block.inline_comment)
-        parts.append(block.line_ending)
-        parts.append(block.body)
+        parts.extend(
+            (
+                block.pre_separator,
+                block.leading_whitespace,
+                block.setup_line,
+                block.inline_comment,
+                block.line_ending,
+                block.body,
+            )
+        )
     parts.append(trailing_text)
     return "".join(parts)
 
@@ -5,11 +5,19 @@ file back without losing spacing or line endings.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, replace
-from typing import List, Union
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterable, Optional, Union
 
+# Blocks and fields are created per question and per option line, so they drop
+# their ``__dict__`` where the interpreter supports it (``slots=`` is new in
+# Python 3.10).
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+# Indexed by ``OptionField.selected``.
+_SELECTED_MARKER = ("", "*")
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, **_SLOTS)
 class ValueField:
     """Represents a ``Value = <X>`` line inside a block."""
 
@@ -19,8 +27,13 @@ class ValueField:
     def render(self) -> str:
         return f"Value = <{self.value}>{self.line_ending}"
 
+    def render_parts(self) -> tuple[str, ...]:
+        """Return the pieces of :meth:`render` so callers can join them into a larger document."""
+
+        return ("Value = <", str(self.value), ">", self.line_ending)
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class OptionField:
     """Represents a selectable option line inside a block."""
 
@@ -34,14 +47,21 @@ class OptionField:
         marker = "*" if self.selected else ""
         return f"{self.prefix}{marker}[{self.code}]{self.label}{self.line_ending}"
 
+    def render_parts(self) -> tuple[str, ...]:
+        """Return the pieces of :meth:`render` so callers can join them into a larger document."""
+
+        return (self.prefix, _SELECTED_MARKER[self.selected], "[", self.code, "]", self.label, self.line_ending)
+
     def toggle(self, make_selected: bool) -> "OptionField":
-        return replace(self, selected=make_selected)
+        # Direct construction is about twice as fast as dataclasses.replace, which
+        # walks the field metadata on every call.
+        return OptionField(self.prefix, self.code, self.label, make_selected, self.line_ending)
 
 
 BlockField = Union[OptionField, ValueField]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, repr=False, **_SLOTS)
 class QuestionBlock:
     """Parsed representation of a Setup Question block with formatting info."""
 
@@ -60,10 +80,28 @@ class QuestionBlock:
     line_ending: str
     leading_whitespace: str
     inline_comment: str
-    fields: List[BlockField]
+    # Field lines are parsed from ``body`` by ``field_parser`` when ``fields`` is
+    # read, so blocks that are never edited are never parsed; edits that rewrite
+    # the fields store them in ``parsed_fields`` instead. Fields are always
+    # replaced whole, so a tuple avoids a list's spare capacity.
+    field_parser: Optional[Callable[[str], tuple[BlockField, ...]]] = field(default=None, repr=False, compare=False)
+    parsed_fields: Optional[tuple[BlockField, ...]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def fields(self) -> tuple[BlockField, ...]:
+        if self.parsed_fields is not None:
+            return self.parsed_fields
+        if self.field_parser is None:
+            return ()
+        return self.field_parser(self.body)
+
+    def __repr__(self) -> str:
+        # Bodies can run to kilobytes; keep log lines and assertion output short.
+        return f"QuestionBlock(name={self.name!r}, line={self.line_number}, body_len={len(self.body)})"
 
     def with_body(self, new_body: str) -> "QuestionBlock":
-        return replace(self, body=new_body)
+        # Fields stored for the old body no longer apply; the parser reads the new one.
+        return replace(self, body=new_body, parsed_fields=None)
 
-    def with_fields(self, new_fields: List[BlockField]) -> "QuestionBlock":
-        return replace(self, fields=new_fields)
+    def with_fields(self, new_fields: Iterable[BlockField]) -> "QuestionBlock":
+        return replace(self, parsed_fields=tuple(new_fields))
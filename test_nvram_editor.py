@@ -151,7 +151,8 @@ def test_save_preserves_batch_edits(tmp_path: Path) -> None:
     saved_text = path.read_text()
     assert "Value = <42>" in saved_text
     assert "*[01]Enabled" in saved_text
-    assert (tmp_path / "nvram.txt.bak").exists()
+    assert (tmp_path / "nvram.txt.bak").read_text() == original
+    assert not (tmp_path / "nvram.txt.tmp").exists()
 
 
 def test_save_accepts_crlf_without_false_change_detection(tmp_path: Path) -> None:
@@ -173,6 +174,41 @@ def test_save_accepts_crlf_without_false_change_detection(tmp_path: Path) -> Non
     assert "\r\n" in saved_text
 
 
+def test_save_rejects_external_modification(tmp_path: Path) -> None:
+    original = "Setup Question = First\nValue = <1>\n"
+    path = tmp_path / "nvram.txt"
+    path.write_text(original)
+
+    manager = nvram_editor.NVRAMManager().load_file(path)
+    external = "Setup Question = First\nValue = <7>\n"
+    path.write_text(external)
+
+    with pytest.raises(ValueError, match="changed since it was loaded"):
+        manager.save(path, manager.rebuild_text())
+
+    assert path.read_text() == external
+    assert not (tmp_path / "nvram.txt.bak").exists()
+    assert manager._pending_reparse is None
+
+
+def test_rollback_last_save_restores_previous_content(tmp_path: Path) -> None:
+    original = "Setup Question = First\r\nValue = <1>\r\n"
+    path = tmp_path / "nvram.txt"
+    path.write_bytes(original.encode("utf-8"))
+
+    manager = nvram_editor.NVRAMManager().load_file(path)
+    updated_blocks = nvram_editor.apply_changes(manager, manager.blocks, [0], None, 5)
+    manager.save(path, manager.rebuild_text(updated_blocks))
+    assert "Value = <5>" in path.read_bytes().decode("utf-8")
+
+    manager.rollback_last_save()
+
+    assert path.read_bytes().decode("utf-8") == original
+    assert manager.blocks[0].fields[0].value == 1
+    with pytest.raises(ValueError, match="No prior save"):
+        manager.rollback_last_save()
+
+
 def test_apply_changes_rejects_out_of_range_value(tmp_path: Path) -> None:
     content = (
         "Setup Question = Range\n"
@@ -188,6 +224,33 @@ def test_apply_changes_rejects_out_of_range_value(tmp_path: Path) -> None:
         nvram_editor.apply_changes(manager, manager.blocks, [0], None, 9)
 
 
+def test_apply_changes_reports_failures_and_continues(tmp_path: Path) -> None:
+    content = (
+        "Setup Question = Narrow\n"
+        "Min = 0\n"
+        "Max = 5\n"
+        "Value = <3>\n"
+        "\n"
+        "Setup Question = Wide\n"
+        "Min = 0\n"
+        "Max = 50\n"
+        "Value = <3>\n"
+    )
+    path = tmp_path / "nvram.txt"
+    path.write_text(content)
+
+    manager = nvram_editor.NVRAMManager().load_file(path)
+    failures = []
+    updated_blocks = nvram_editor.apply_changes(
+        manager, manager.blocks, [0, 1], None, 9, on_error=lambda idx, exc: failures.append((idx, str(exc)))
+    )
+
+    assert [idx for idx, _ in failures] == [0]
+    assert "block 'Narrow'" in failures[0][1]
+    assert updated_blocks[0] is manager.blocks[0]
+    assert "Value = <9>" in updated_blocks[1].body
+
+
 @pytest.mark.parametrize(
     "raw,expected,conversion_note",
     [
@@ -210,3 +273,48 @@ def test_validate_numeric_input_accepts_valid_values(raw: str, expected: int, co
 def test_validate_numeric_input_rejects_invalid_values(raw: str) -> None:
     with pytest.raises(ValueError):
         nvram_editor.validate_numeric_input(raw)
+
+
+def test_save_cleans_up_temp_file_when_backup_rename_fails(tmp_path: Path) -> None:
+    original = "Setup Question = First\nValue = <1>\n"
+    path = tmp_path / "nvram.txt"
+    path.write_text(original)
+    (tmp_path / "nvram.txt.bak").mkdir()
+
+    manager = nvram_editor.NVRAMManager().load_file(path)
+    with pytest.raises(OSError):
+        manager.save(path, manager.rebuild_text())
+
+    assert path.read_text() == original
+    assert not (tmp_path / "nvram.txt.tmp").exists()
+    assert manager._pending_reparse is None
+
+
+def test_update_options_keeps_fields_in_step_with_body_on_latin1_separators() -> None:
+    sample = "Setup Question = Ellipsis\nOptions =*[00]Off\n[07]x\x85y\r\n"
+    blocks, _ = nvram_parsing.find_blocks(sample)
+
+    updated = nvram_editor.NVRAMManager().update_options(blocks[0], "[07]x\x85y")
+
+    assert "*[07]x\x85y\r\n" in updated.body
+    assert updated.fields == updated.with_body(updated.body).fields
+    assert [field.label for field in updated.fields] == ["Off", "x\x85y"]
+
+
+def test_update_options_handles_cr_only_line_endings() -> None:
+    blocks, _ = nvram_parsing.find_blocks("Setup Question = A\rOptions =*[00]Off\r[01]On\r")
+
+    updated = nvram_editor.NVRAMManager().update_options(blocks[0], "[01]On")
+
+    assert updated.body == "Options =[00]Off\r*[01]On\r"
+    assert updated.fields == updated.with_body(updated.body).fields
+    assert [field.selected for field in updated.fields] == [False, True]
+
+
+def test_crc_marker_requires_assignment_on_first_line(tmp_path: Path) -> None:
+    path = tmp_path / "nvram.txt"
+    path.write_text("HIICrc32 x\nSetup Question = First\nValue = <1>\n")
+    assert nvram_editor.NVRAMManager().load_file(path).has_crc_marker is False
+
+    path.write_text("HIICrc32 = abcd\nSetup Question = First\nValue = <1>\n")
+    assert nvram_editor.NVRAMManager().load_file(path).has_crc_marker is True
@@ -31,3 +31,34 @@ def test_find_blocks_parses_hex_value() -> None:
     fields = blocks[0].fields
     assert any(isinstance(field, ValueField) and field.value == 31 for field in fields)
     assert trailing_text == ""
+
+
+def test_field_render_parts_match_render() -> None:
+    sample = "Setup Question = Example\nOptions =*[00]Off\r\n         [01]On\nValue = <0x1f>"
+
+    blocks, _ = nvram_parsing.find_blocks(sample)
+
+    rendered = [field.render() for field in blocks[0].fields]
+    assert rendered == ["Options =*[00]Off\r\n", "         [01]On\n", "Value = <31>"]
+    assert all(field.render() == "".join(field.render_parts()) for field in blocks[0].fields)
+
+
+def test_empty_token_does_not_hide_following_help_string() -> None:
+    blocks, _ = nvram_parsing.find_blocks("Setup Question = A\nToken =\nHelp String = Enable boot\n")
+
+    assert blocks[0].help_string == "Enable boot"
+
+
+def test_empty_help_string_does_not_hide_following_token() -> None:
+    blocks, _ = nvram_parsing.find_blocks("Setup Question = A\nHelp String =\nToken = 0x12\n")
+
+    assert blocks[0].token == "0x12"
+
+
+def test_find_blocks_splits_cr_only_option_lines() -> None:
+    blocks, _ = nvram_parsing.find_blocks("Setup Question = A\rOptions =*[00]Off\r[01]On\r")
+
+    options = [field for field in blocks[0].fields if isinstance(field, OptionField)]
+    assert [(field.code, field.label, field.selected) for field in options] == [("00", "Off", True), ("01", "On", False)]
+    assert all(field.line_ending == "\r" for field in options)
+    assert nvram_parsing.selected_option(blocks[0].body) == "*[00]Off"